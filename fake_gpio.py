@@ -0,0 +1,45 @@
+"""
+Stand-in for RPi.GPIO so the steppers and rigs can be driven without a Raspberry Pi.
+Pin levels are kept in memory, set MARCS_FAKE_GPIO=1 to use it instead of the real module.
+"""
+import threading
+
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+LOW = 0
+HIGH = 1
+
+_lock = threading.Lock()
+mode = None
+pins = {}
+writes = 0
+
+
+def setmode(new_mode):
+    global mode
+    mode = new_mode
+
+
+def setup(pin, direction):
+    with _lock:
+        pins[pin] = LOW
+
+
+def output(pin, value):
+    global writes
+    with _lock:
+        if pin not in pins:
+            raise RuntimeError(f"The GPIO channel {pin} has not been set up as an OUTPUT")
+        pins[pin] = value
+        writes += 1
+
+
+def input(pin):
+    return pins.get(pin, LOW)
+
+
+def cleanup():
+    with _lock:
+        pins.clear()
@@ -0,0 +1,6 @@
+import os
+
+if os.environ.get("MARCS_FAKE_GPIO") == "1":
+    from marcs.CubeSolver import fake_gpio as GPIO
+else:
+    import RPi.GPIO as GPIO
@@ -0,0 +1,319 @@
+import logging as l
+import threading
+from argparse import ArgumentParser, ArgumentTypeError
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from time import monotonic, time
+
+from marcs.CubeSolver.logger import log, set_log_level
+from marcs.CubeSolver.tables import solver_pool
+from marcs.TwoPhaseSolver import solver as two_phase
+
+# Facelets are handled in 3D so whole cube rotations and face turns are plain rotation matrices.
+# The cube spans [-1, 1] on each axis with x towards R, y towards U and z towards F, a facelet being
+# the position of its cubie and the normal of the face it is on. Cube strings are in the order
+# expected by solve: U1-U9, R1-R9, F1-F9, D1-D9, L1-L9, B1-B9.
+FACES = "URFDLB"
+NORMALS = {
+    "U": (0, 1, 0),
+    "R": (1, 0, 0),
+    "F": (0, 0, 1),
+    "D": (0, -1, 0),
+    "L": (-1, 0, 0),
+    "B": (0, 0, -1),
+}
+FACE_OF_NORMAL = {v: k for k, v in NORMALS.items()}
+
+
+def _facelet_position(face: str, row: int, col: int) -> tuple:
+    if face == "U":
+        return -1 + col, 1, -1 + row
+    elif face == "R":
+        return 1, 1 - row, 1 - col
+    elif face == "F":
+        return -1 + col, 1 - row, 1
+    elif face == "D":
+        return -1 + col, -1, 1 - row
+    elif face == "L":
+        return -1, 1 - row, -1 + col
+    elif face == "B":
+        return 1 - col, 1 - row, -1
+
+
+FACELETS = [(_facelet_position(face, i // 3, i % 3), NORMALS[face]) for face in FACES for i in range(9)]
+FACELET_INDEX = {facelet: i for i, facelet in enumerate(FACELETS)}
+SOLVED = "".join(face * 9 for face in FACES)
+
+
+def _dot(a: tuple, b: tuple) -> int:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _matmul(m: tuple, v: tuple) -> tuple:
+    return tuple(_dot(row, v) for row in m)
+
+
+def _transpose(m: tuple) -> tuple:
+    return tuple(zip(*m))
+
+
+def _compose(a: tuple, b: tuple) -> tuple:
+    return tuple(tuple(_dot(row, col) for col in _transpose(b)) for row in a)
+
+
+def _quarter_turn(face: str) -> tuple:
+    """
+    Matrix of a 90 degrees clockwise rotation when looking at face from the outside
+    """
+    n = NORMALS[face]
+    columns = []
+    for v in ((1, 0, 0), (0, 1, 0), (0, 0, 1)):
+        cross = (n[1] * v[2] - n[2] * v[1], n[2] * v[0] - n[0] * v[2], n[0] * v[1] - n[1] * v[0])
+        columns.append(tuple(n[i] * _dot(n, v) - cross[i] for i in range(3)))
+    return _transpose(tuple(columns))
+
+
+def _rotations() -> list:
+    """
+    The 24 orientations of the cube, identity first
+    """
+    identity = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+    generators = [_quarter_turn("R"), _quarter_turn("U")]
+    found = [identity]
+    for m in found:
+        for g in generators:
+            r = _compose(g, m)
+            if r not in found:
+                found.append(r)
+    return found
+
+
+ROTATIONS = _rotations()
+# Turns of 0, 120 and 240 degrees around the URF-DBL diagonal, the three search axes of the two phase solver
+DIAGONAL_TURN = ((0, 0, 1), (1, 0, 0), (0, 1, 0))
+DIAGONAL_ROTATIONS = [ROTATIONS[0], DIAGONAL_TURN, _compose(DIAGONAL_TURN, DIAGONAL_TURN)]
+MAX_VARIANTS = 2 * len(DIAGONAL_ROTATIONS)  # Each axis for the cube and its inverse
+
+
+def apply_move(cubestr: str, move: str) -> str:
+    """
+    :param move: Face followed by the number of clockwise quarter turns e.g. U1, R2, F3
+    """
+    face, n = move[0], int(move[1]) if len(move) > 1 else 1
+    turn = _quarter_turn(face)
+    facelets = list(cubestr)
+    for _ in range(n % 4):
+        turned = list(facelets)
+        for i, (position, normal) in enumerate(FACELETS):
+            if _dot(position, NORMALS[face]) == 1:
+                turned[FACELET_INDEX[(_matmul(turn, position), _matmul(turn, normal))]] = facelets[i]
+        facelets = turned
+    return "".join(facelets)
+
+
+def apply_moves(cubestr: str, moves: list) -> str:
+    for move in moves:
+        cubestr = apply_move(cubestr, move)
+    return cubestr
+
+
+def rotate(cubestr: str, rotation: tuple) -> str:
+    """
+    Cube string of the same cube after turning it as a whole, faces are renamed after their new centers
+    """
+    rename = {face: FACE_OF_NORMAL[_matmul(rotation, NORMALS[face])] for face in FACES}
+    rotated = [""] * len(FACELETS)
+    for i, (position, normal) in enumerate(FACELETS):
+        rotated[FACELET_INDEX[(_matmul(rotation, position), _matmul(rotation, normal))]] = rename[cubestr[i]]
+    return "".join(rotated)
+
+
+def invert(cubestr: str) -> str:
+    """
+    Cube string of the inverse state, i.e. the one reached by doing the reverse of the moves leading to cubestr
+    """
+    if len(cubestr) != len(FACELETS) or set(cubestr) != set(FACES):
+        raise ValueError(f"Invalid cube string '{cubestr}'")
+    cubies = {}
+    for i, (position, normal) in enumerate(FACELETS):
+        cubies.setdefault(position, []).append(cubestr[i])
+    # Each facelet of cubestr comes from the facelet of the same color on the cubie sitting where its colors point
+    origin = []
+    for i, (position, normal) in enumerate(FACELETS):
+        home = tuple(sum(NORMALS[c][axis] for c in cubies[position]) for axis in range(3))
+        facelet = (home, NORMALS[cubestr[i]])
+        if facelet not in FACELET_INDEX:
+            raise ValueError(f"Invalid cube string '{cubestr}'")
+        origin.append(FACELET_INDEX[facelet])
+    if len(set(origin)) != len(origin):
+        raise ValueError(f"Invalid cube string '{cubestr}'")
+    inverse = [""] * len(FACELETS)
+    for i, j in enumerate(origin):
+        inverse[j] = SOLVED[i]
+    return "".join(inverse)
+
+
+def invert_moves(moves: list) -> list:
+    inverse_turns = {"1": "3", "2": "2", "3": "1"}
+    return [move[0] + inverse_turns[move[1]] for move in reversed(moves)]
+
+
+def unrotate_moves(moves: list, rotation: tuple) -> list:
+    """
+    Maps moves found on the rotated cube back to the faces of the original one
+    """
+    back = _transpose(rotation)
+    return [FACE_OF_NORMAL[_matmul(back, NORMALS[move[0]])] + move[1:] for move in moves]
+
+
+def variants(cubestr: str, n: int = MAX_VARIANTS) -> list:
+    """
+    The other orientations are conjugates of these by the cube symmetries kept by the two phase coordinates,
+    so searching them would only repeat the same search.
+    :return: Up to n (rotation, inverted, cubestr) tuples, the original state and its inverse coming first
+    """
+    found = []
+    inverse = invert(cubestr)
+    for rotation in DIAGONAL_ROTATIONS:
+        for inverted, state in ((False, cubestr), (True, inverse)):
+            if len(found) == n:
+                return found
+            found.append((rotation, inverted, rotate(state, rotation)))
+    return found
+
+
+def _parse(result: str) -> list:
+    """
+    Moves of a solution string formatted like 'U1 R2 F3 (3f)'
+    """
+    if result.startswith("Error"):
+        raise ValueError(result)
+    moves = result.split(" ")[0:-1]
+    for move in moves:
+        if len(move) != 2 or move[0] not in FACES or move[1] not in "123":
+            raise ValueError(f"Unexpected move '{move}' in '{result}'")
+    return moves
+
+
+def _format(moves: list) -> str:
+    return " ".join(moves + [f"({len(moves)}f)"])
+
+
+def search(cubestr: str, max_length: int = 20, timeout: float = 3) -> str:
+    """
+    Runs the two phase search of solve along one axis only, without the inverse, so each process does its own share.
+    Falls back on solve, which searches all the axes in threads, if the solver has no SolverThread.
+    """
+    if not hasattr(two_phase, "SolverThread"):
+        return two_phase.solve(cubestr, max_length, timeout)
+    fc = two_phase.face.FaceCube()
+    s = fc.from_string(cubestr)
+    if s != two_phase.cubie.CUBE_OK:
+        return s
+    cc = fc.to_cubie_cube()
+    s = cc.verify()
+    if s != two_phase.cubie.CUBE_OK:
+        return s
+    solutions = []
+    searcher = two_phase.SolverThread(cc, 0, 0, max_length, timeout, monotonic(), solutions, threading.Event(), [999])
+    searcher.run()
+    return _format([m.name for m in solutions[-1]] if solutions else [])
+
+
+def _terminate(pool: ProcessPoolExecutor):
+    """
+    Stops the searches still running instead of letting them use the cpus until they time out
+    """
+    if hasattr(pool, "terminate_workers"):  # Python 3.14+
+        pool.terminate_workers()
+        return
+    for process in list(pool._processes.values()):
+        process.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def positive_int(value: str) -> int:
+    """
+    argparse type for process and variant counts
+    """
+    n = int(value)
+    if n < 1:
+        raise ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
+def parallel_solve(cubestr: str, n_variants: int = MAX_VARIANTS, deadline: float = None, max_length: int = 20,
+                   timeout: float = 3, pool: ProcessPoolExecutor = None) -> str:
+    """
+    Searches the state and its inverse along the three axes of the two phase solver, each in its own process
+    :param n_variants: Number of searches to run concurrently, capped at MAX_VARIANTS
+    :param deadline: Seconds to wait for the shortest solution, if None return the first one found
+    :param max_length: Stop searching once a solution of at most this many moves is found, as in solve
+    :param timeout: Seconds after which each search returns the best solution it found so far, as in solve
+    :param pool: Solver processes to use, searches still running are left to time out in them. If None a pool
+     is created for this call and its searches are stopped once the sequence is found.
+    :return: Solving sequence in the same format as solve
+    """
+    if n_variants < 1:
+        raise ValueError(f"Need at least one search, got {n_variants}")
+    n_variants = min(n_variants, MAX_VARIANTS)
+    own_pool = pool is None
+    if own_pool:
+        pool = solver_pool(max_workers=n_variants)
+    start_time = time()
+    futures = {pool.submit(search, state, max_length, timeout): (rotation, inverted)
+               for rotation, inverted, state in variants(cubestr, n_variants)}
+    pending = set(futures)
+    best = None
+    last_error = None
+    try:
+        while pending:
+            if deadline is None or best is None and time() - start_time >= deadline:
+                wait_timeout = None  # Past the deadline without a solution, take the next one
+            else:
+                wait_timeout = max(deadline - (time() - start_time), 0)
+            done, pending = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                rotation, inverted = futures[future]
+                try:
+                    moves = _parse(future.result())
+                except Exception as e:
+                    log(l.DEBUG, f"Variant failed: {e}")
+                    last_error = e
+                    continue
+                if inverted:
+                    moves = invert_moves(moves)
+                moves = unrotate_moves(moves, rotation)
+                if apply_moves(cubestr, moves) != SOLVED:
+                    log(l.WARNING, f"Discarding sequence {moves} which does not solve the cube")
+                    continue
+                log(l.DEBUG, f"Got {len(moves)} moves after {round(time() - start_time, 3)}s "
+                             f"(inverted: {inverted}, rotation: {rotation})")
+                if best is None or len(moves) < len(best):
+                    best = moves
+            if best is not None and (deadline is None or time() - start_time >= deadline):
+                break
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_pool:
+            _terminate(pool)
+    if best is None:
+        raise ValueError(f"No solution found for '{cubestr}', last error: {last_error}")
+    return _format(best)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Solve a cube string using several processes")
+    parser.add_argument("cubestr", type=str, help="Cube string to solve")
+    parser.add_argument("-n", "--variants", type=positive_int, default=MAX_VARIANTS,
+                        help=f"Number of rotated and inverted states to search concurrently "
+                             f"(default and max {MAX_VARIANTS})")
+    parser.add_argument("-d", "--deadline", type=float, default=None,
+                        help="Return the shortest solution found within this many seconds instead of the first one")
+    parser.add_argument("-ll", "--log-level", type=str, choices=["debug", "info", "warning"], default="info",
+                        help="Set log level")
+    args = parser.parse_args()
+    set_log_level(getattr(l, args.log_level.upper()))
+    start = time()
+    moves = parallel_solve(args.cubestr, n_variants=args.variants, deadline=args.deadline)
+    log(l.INFO, f"Solving sequence is: {moves}, found in {round(time() - start, 3)}s")
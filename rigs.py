@@ -0,0 +1,192 @@
+import atexit
+import json
+import logging as l
+import os
+import sys
+import threading
+from argparse import ArgumentParser
+from concurrent.futures import Executor
+from pathlib import Path
+from time import time
+
+from marcs.CubeSolver.gpio import GPIO
+from marcs.CubeSolver.logger import log, set_log_level
+from marcs.CubeSolver.solver import GPIOs, Cube, cleanup, do_moves, generate_scramble, jog_if_needed
+from marcs.CubeSolver.tables import solver_pool
+from marcs.TwoPhaseSolver.solver import solve
+
+PIN_NAMES = ["A1N1", "A1N2", "B1N1", "B1N2"]
+
+scramble_lock = threading.Lock()  # cubelib keeps the cube in globals, only one rig can scramble at a time
+
+
+def load_pins(path: Path) -> dict:
+    """
+    Loads the pin map of a rig from a json file laid out like GPIOs e.g. {"RED": {"A1N1": 8, ...}, ...}
+    """
+    with open(str(path)) as fp:
+        pins = json.load(fp)
+    for gpio in GPIOs:
+        if gpio.name not in pins:
+            raise ValueError(f"Pin map '{path}' is missing color {gpio.name}")
+        if sorted(pins[gpio.name]) != sorted(PIN_NAMES):
+            raise ValueError(f"Pin map '{path}' needs pins {PIN_NAMES} for {gpio.name}, got {list(pins[gpio.name])}")
+    return {gpio.name: {x: int(pins[gpio.name][x]) for x in PIN_NAMES} for gpio in GPIOs}
+
+
+def check_pin_conflicts(pin_maps: dict):
+    used = {}
+    for rig, pins in pin_maps.items():
+        for color, color_pins in pins.items():
+            for pin in color_pins.values():
+                if pin in used:
+                    raise ValueError(f"Pin {pin} of {rig} {color} is already used by {used[pin]}")
+                used[pin] = f"{rig} {color}"
+
+
+class Rig(threading.Thread):
+    """
+    Drives one robot in its own thread, scrambling then solving n_solves times.
+    Solving sequences are computed by the shared worker pool. Setting stop ends the run after the move in progress.
+    """
+
+    def __init__(self, name: str, pins: dict, pool: Executor, n_solves: int, delay_time: float,
+                 move_delay_time: float, half_step: bool, stop: threading.Event):
+        super().__init__(name=name)
+        self.cube = Cube(pins=pins, name=name)
+        self.pool = pool
+        self.stop = stop
+        self.n_solves = n_solves
+        self.delay_time = delay_time
+        self.move_delay_time = move_delay_time
+        self.half_step = half_step
+        self.solves = 0
+        self.start_time = None
+        self.end_time = None
+        self.error = None
+
+    def run_moves(self, moves: list):
+        do_moves(self.cube, moves, delay_time=self.delay_time, move_delay_time=self.move_delay_time,
+                 half_step=self.half_step, stop=self.stop)
+
+    def run(self):
+        self.start_time = time()
+        try:
+            for i in range(self.n_solves):
+                if self.stop.is_set():
+                    break
+                with scramble_lock:
+                    scramble_moves, cubestr = generate_scramble()
+                log(l.INFO, f"[{self.name}] Scrambling ({i + 1}/{self.n_solves})...")
+                self.run_moves(scramble_moves)
+                if self.stop.is_set():
+                    break
+
+                log(l.INFO, f"[{self.name}] Generating solving sequence...")
+                moves = self.pool.submit(solve, cubestr).result()
+                solve_moves = moves.split(" ")[0:-1]
+                log(l.INFO, f"[{self.name}] Solving sequence is: {moves}")
+
+                solve_start = time()
+                self.run_moves(solve_moves)
+                if self.stop.is_set():
+                    break
+                self.solves += 1
+                log(l.INFO, f"[{self.name}] Solving done in {round(time() - solve_start, 3)}s with "
+                            f"{len(solve_moves)} moves")
+        except Exception as e:
+            log(l.ERROR, f"[{self.name}] Stopped after {self.solves} solves: {e}")
+            self.error = e
+        finally:
+            self.end_time = time()
+
+    @property
+    def solves_per_hour(self) -> float:
+        if self.start_time is None:
+            return 0.
+        elapsed = (self.end_time or time()) - self.start_time
+        return self.solves / elapsed * 3600 if elapsed > 0 else 0.
+
+
+def report(rigs: list, start_time: float):
+    for rig in rigs:
+        log(l.INFO, f"{rig.name}: {rig.solves} solves, {round(rig.solves_per_hour, 1)} solves/h")
+    elapsed = time() - start_time
+    total = sum(rig.solves for rig in rigs)
+    per_hour = total / elapsed * 3600 if elapsed > 0 else 0.
+    log(l.INFO, f"All rigs: {total} solves in {round(elapsed, 3)}s, {round(per_hour, 1)} solves/h")
+    for rig in rigs:
+        if rig.error is not None:
+            log(l.ERROR, f"{rig.name} failed: {rig.error}")
+
+
+def cleanup_rigs(rigs: list):
+    for rig in rigs:
+        cleanup(rig.cube, release_gpio=False)
+    GPIO.cleanup()
+
+
+def main():
+    parser = ArgumentParser(description="Drive several MARCS Rubik's cube solvers from one process. "
+                                        "Set MARCS_FAKE_GPIO=1 to run without a Raspberry Pi")
+    parser.add_argument("pins", type=Path, nargs="+",
+                        help="Pin map json file of each rig, the rig is named after the file")
+    parser.add_argument("-n", "--solves", type=int, default=1, help="Number of solves per rig (default 1)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="Number of solver processes shared by all rigs (default cpu count)")
+    parser.add_argument("-t", "--delay-time", type=float, default=5e-3,
+                        help="Sleep time between each step of the motors in seconds (default 5e-3)")
+    parser.add_argument("-mdt", "--move-delay-time", type=float, default=5e-2,
+                        help="Sleep time between each move (default 5e-2")
+    parser.add_argument("-ll", "--log-level", type=str, choices=["debug", "info", "warning"], default="info",
+                        help="Set log level")
+    parser.add_argument("--no-jog", action="store_true", default=False,
+                        help="Skip initial jogging calibration of steppers, use with caution")
+    parser.add_argument("--full-step", dest="half_step", action="store_false", default=True,
+                        help="Use full steps when moving (not recommended)")
+    args = parser.parse_args()
+
+    set_log_level(getattr(l, args.log_level.upper()))
+    log(l.DEBUG, f"Passed arguments: {sys.argv}")
+    pin_maps = {path.stem: load_pins(path) for path in args.pins}
+    if len(pin_maps) != len(args.pins):
+        parser.error("Pin map files must have different names")
+    check_pin_conflicts(pin_maps)
+
+    pool = solver_pool(max_workers=args.workers)
+    stop = threading.Event()
+    rigs = [Rig(name, pins, pool, n_solves=args.solves, delay_time=args.delay_time,
+                move_delay_time=args.move_delay_time, half_step=args.half_step, stop=stop)
+            for name, pins in pin_maps.items()]
+    atexit.register(cleanup_rigs, rigs)
+    log(l.INFO, f"{len(rigs)} rigs instantiated with {args.workers} solver workers")
+    start_time = time()
+    try:
+        for rig in rigs:
+            if not args.no_jog:
+                log(l.INFO, f"Starting jogging sequence of {rig.name}")
+                jog_if_needed(rig.cube, half_step=args.half_step)
+            else:
+                log(l.WARNING, f"Jogging sequence of {rig.name} skipped")
+
+        input("When ready to solve, press enter")
+        start_time = time()
+        for rig in rigs:
+            rig.start()
+        for rig in rigs:
+            rig.join()
+    except KeyboardInterrupt:
+        log(l.INFO, "Keyboard interrupt, stopping the rigs after their current move")
+        stop.set()
+        for rig in rigs:
+            if rig.is_alive():
+                rig.join()
+    finally:
+        pool.shutdown(wait=False)
+    report(rigs, start_time)
+    if any(rig.error is not None for rig in rigs):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
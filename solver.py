@@ -1,14 +1,17 @@
 import atexit
+import copy
 import logging as l
 import sys
+import threading
 import numpy as np
 from argparse import ArgumentParser
 from enum import Enum
 from pathlib import Path
 from time import sleep, time
 
-import RPi.GPIO as GPIO
+from marcs.CubeSolver.gpio import GPIO
 from marcs.CubeSolver.logger import log, set_log_level
+from marcs.CubeSolver.parallel_solve import MAX_VARIANTS, parallel_solve, positive_int
 from marcs.CubeSolver.stepper import Stepper
 from marcs.RubiksCubeSolver import cube as cubelib
 from marcs.TwoPhaseSolver.solver import solve
@@ -64,13 +67,20 @@ class Cube:
                  YELLOW (D)
     """
 
-    def __init__(self):
-        self.red = Stepper(*list(GPIOs.RED.value[x] for x in GPIOs.RED.value))
-        self.green = Stepper(*list(GPIOs.GREEN.value[x] for x in GPIOs.GREEN.value))
-        self.blue = Stepper(*list(GPIOs.BLUE.value[x] for x in GPIOs.BLUE.value))
-        self.yellow = Stepper(*list(GPIOs.YELLOW.value[x] for x in GPIOs.YELLOW.value))
-        self.orange = Stepper(*list(GPIOs.ORANGE.value[x] for x in GPIOs.ORANGE.value))
-        self.white = Stepper(*list(GPIOs.WHITE.value[x] for x in GPIOs.WHITE.value))
+    def __init__(self, pins: dict = None, name: str = ""):
+        """
+        :param pins: Maps each color to its stepper pins e.g. {"RED": {"A1N1": 8, ...}}, defaults to GPIOs
+        :param name: Name of the rig, used to keep the stepper state files of each rig apart
+        """
+        if pins is None:
+            pins = {gpio.name: gpio.value for gpio in GPIOs}
+        self.name = name
+        self.red = Stepper(*list(pins["RED"][x] for x in pins["RED"]))
+        self.green = Stepper(*list(pins["GREEN"][x] for x in pins["GREEN"]))
+        self.blue = Stepper(*list(pins["BLUE"][x] for x in pins["BLUE"]))
+        self.yellow = Stepper(*list(pins["YELLOW"][x] for x in pins["YELLOW"]))
+        self.orange = Stepper(*list(pins["ORANGE"][x] for x in pins["ORANGE"]))
+        self.white = Stepper(*list(pins["WHITE"][x] for x in pins["WHITE"]))
 
     ids = {
         "D": "white",
@@ -93,6 +103,14 @@ class Cube:
         name = self.ids.get(name, name)
         return object.__getattribute__(self, name)
 
+    def state_file(self, id: str) -> str:
+        """
+        Name of the file holding the stepper state of face id, prefixed by the rig name if there is one
+        """
+        if self.name:
+            return f"{self.name}_{Cube.ids[id]}"
+        return Cube.ids[id]
+
     @staticmethod
     def _opposite_direction(direction: str):
         if direction is "CW":
@@ -201,7 +219,7 @@ def jog(cube: Cube, half_step: bool):
                     log(l.DEBUG, f"Reversing direction, now rotating {direction}")
                 else:
                     log(l.WARNING, f"Don't know what to do with {option}, ignoring")
-            face.store_state(Cube.ids[id])
+            face.store_state(cube.state_file(id))
             face.disarm()
             log(l.INFO, f"Stored state of {Cube.ids[id]}")
     except KeyboardInterrupt:
@@ -216,12 +234,12 @@ def jog_if_needed(cube: Cube, force=False, half_step: bool = False):
             jog(cube, half_step=half_step)
             jogged = True
             break
-        elif not Path("states", Cube.ids[id]).exists():
+        elif not Path("states", cube.state_file(id)).exists():
             jog(cube, half_step=half_step)
             jogged = True
             break
         else:
-            with open(str(Path("states", Cube.ids[id]))) as fp:
+            with open(str(Path("states", cube.state_file(id)))) as fp:
                 state = fp.read()
             if state == "-1":
                 jog(cube, half_step=half_step)
@@ -233,14 +251,64 @@ def jog_if_needed(cube: Cube, force=False, half_step: bool = False):
         log(l.INFO, "Jogging sequence completed")
 
 
-def cleanup(cube):
+def cleanup(cube, release_gpio: bool = True):
     log(l.INFO, "Cleaning up and exiting")
     for id in Cube.ids:
         face = getattr(cube, id)
         face.arm()
-        face.store_state(Cube.ids[id])
+        face.store_state(cube.state_file(id))
         face.state = 8  # De energize windings to preserve steppers
-    GPIO.cleanup()
+    if release_gpio:
+        GPIO.cleanup()
+
+
+_solved_cube = None  # cubelib's cube before the first scramble
+
+
+def generate_scramble():
+    """
+    Generates a random scramble with cubelib and the cube string of the resulting state.
+    cubelib keeps its state in globals so this is not thread safe.
+    :return: List of scrambling moves and the cube string to feed to solve
+    """
+    global _solved_cube
+    if _solved_cube is None:
+        _solved_cube = copy.deepcopy(cubelib.a)
+    else:
+        cubelib.a[:] = copy.deepcopy(_solved_cube)  # Scramble from solved like the first time
+    cubelib.scramble()
+    scramble_seq = cubelib.get_scramble()
+    scramble_moves = scramble_seq.split(" ")
+    log(l.DEBUG, f"Scrambling sequence is: {scramble_seq}")
+    conversion_dict = {
+        "W": "D", "G": "R", "R": "F", "O": "B", "Y": "U", "B": "L"
+    }
+    cubestr = ""
+    c = [np.copy(face) for face in cubelib.a]  # Rotated for the cube string only, cubelib's cube stays as is
+    c[2] = np.rot90(c[2], 3)
+    c[3] = np.rot90(c[3])
+    c[5] = np.rot90(c[5], 2)
+    for face in [0, 2, 1, 4, 3, 5]:
+        for row in range(3):
+            for col in range(3):
+                cubestr += conversion_dict[c[face][row][col]]
+    return scramble_moves, cubestr
+
+
+def do_moves(cube: Cube, moves: list, delay_time: float, move_delay_time: float, half_step: bool,
+             interactive: bool = False, stop: threading.Event = None):
+    """
+    :param stop: When set, return after the move in progress instead of doing the remaining ones
+    """
+    for i, move in enumerate(moves):
+        if stop is not None and stop.is_set():
+            log(l.DEBUG, f"Stopped with {len(moves) - i} moves left")
+            return
+        log(l.DEBUG, move)
+        if interactive:
+            input()
+        cube.move(move, sleep_time=delay_time, half_step=half_step)
+        sleep(move_delay_time)
 
 
 def main():
@@ -262,6 +330,11 @@ def main():
                         help="Use full steps when moving (not recommended)")
     parser.add_argument("--max-speed", action="store_true", default=False, help="Use fastest settings")
     parser.add_argument("-c", "--cubestr", type=str, default="", help="Cube string to use for solving")
+    parser.add_argument("-p", "--processes", type=positive_int, default=1,
+                        help="Search the cube and its inverse along the solver's 3 axes in this many processes "
+                             f"(default 1, max {MAX_VARIANTS})")
+    parser.add_argument("--solve-deadline", type=float, default=None,
+                        help="With --processes, keep the shortest solution found within this many seconds")
     args = parser.parse_args()
 
     log(l.INFO, "Starting MARCS main loop")
@@ -293,49 +366,28 @@ def main():
 
         if not args.cubestr:
             log(l.INFO, "Generating scrambling sequence...")
-            cubelib.scramble()
-            scramble_seq = cubelib.get_scramble()
-            scramble_moves = scramble_seq.split(" ")
-            log(l.DEBUG, f"Scrambling sequence is: {scramble_seq}")
+            scramble_moves, cubestr = generate_scramble()
 
             log(l.INFO, "Scrambling...")
-            for move in scramble_moves:
-                log(l.DEBUG, move)
-                if args.interactive:
-                    input()
-                cube.move(move, sleep_time=args.delay_time, half_step=args.half_step)
-                sleep(args.move_delay_time)
-
+            do_moves(cube, scramble_moves, delay_time=args.delay_time, move_delay_time=args.move_delay_time,
+                     half_step=args.half_step, interactive=args.interactive)
             log(l.INFO, "Scrambling done")
-            conversion_dict = {
-                "W": "D", "G": "R", "R": "F", "O": "B", "Y": "U", "B": "L"
-            }
-            cubestr = ""
-            c = cubelib.a
-            c[2] = np.rot90(c[2], 3)
-            c[3] = np.rot90(c[3])
-            c[5] = np.rot90(c[5], 2)
-            for face in [0, 2, 1, 4, 3, 5]:
-                for row in range(3):
-                    for col in range(3):
-                        cubestr += conversion_dict[c[face][row][col]]
         else:
             cubestr = args.cubestr
 
         log(l.INFO, "Generating solving sequence...")
-        moves = solve(cubestr)
+        if args.processes > 1:
+            moves = parallel_solve(cubestr, n_variants=args.processes, deadline=args.solve_deadline)
+        else:
+            moves = solve(cubestr)
         solve_moves = moves.split(" ")[0:-1]
         log(l.INFO, f"Solving sequence is: {moves}")
 
         input("When ready to solve, press enter")
         start_time = time()
         log(l.INFO, "Solving...")
-        for move in solve_moves:
-            log(l.DEBUG, move)
-            if args.interactive:
-                input()
-            cube.move(move, sleep_time=args.delay_time, half_step=args.half_step)
-            sleep(args.move_delay_time)
+        do_moves(cube, solve_moves, delay_time=args.delay_time, move_delay_time=args.move_delay_time,
+                 half_step=args.half_step, interactive=args.interactive)
         end_time = time()
         solve_time = end_time - start_time
         log(l.INFO, f"Solving done in {round(solve_time, 3)}s with {len(solve_moves)} moves, exiting")
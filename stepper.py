@@ -1,7 +1,7 @@
-import RPi.GPIO as GPIO
 import argparse
 import ast
 import logging as l
+from marcs.CubeSolver.gpio import GPIO
 from marcs.CubeSolver.logger import log, set_log_level
 from pathlib import Path
 from time import sleep
@@ -0,0 +1,38 @@
+"""
+The solver loads its move and pruning tables when it is imported. Worker processes forked after that
+inherit them and share their pages with this process instead of loading their own copy, since the tables
+are only read while solving. Started any other way, each worker would import the solver again.
+"""
+import gc
+import logging as l
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+from marcs.CubeSolver.logger import log
+import marcs.TwoPhaseSolver.solver  # Loads the move and pruning tables once, in this process
+
+
+def _ready():
+    pass
+
+
+def _ignore_interrupts():
+    # Ctrl+C reaches the whole process group, only the controller should stop on it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def solver_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    """
+    Pool of solver processes sharing the tables loaded by this process. All the workers are started before
+    returning so the fork happens now and not on a later submit, possibly while other threads hold locks.
+    The workers ignore SIGINT, Ctrl+C is left for the controller to stop its rigs cleanly.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        log(l.WARNING, "Can't fork on this platform, each solver process loads its own tables")
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=_ignore_interrupts)
+    gc.freeze()  # Keeps the garbage collector of the workers from writing to the pages they share
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("fork"),
+                               initializer=_ignore_interrupts)
+    pool.submit(_ready).result()  # With fork, the first submit starts all the workers
+    return pool
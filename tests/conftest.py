@@ -0,0 +1,39 @@
+import importlib
+import os
+import sys
+import types
+from pathlib import Path
+
+# The steppers are driven through the in memory GPIO, this has to be set before anything imports gpio.py
+os.environ["MARCS_FAKE_GPIO"] = "1"
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _package(name: str, path: list = None) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__path__ = path or []
+    sys.modules[name] = module
+    return module
+
+
+# This checkout is the marcs.CubeSolver package
+try:
+    importlib.import_module("marcs")
+except ImportError:
+    _package("marcs")
+_package("marcs.CubeSolver", [str(ROOT)])
+
+# The solver and scrambler live in other repos, tests replace what they use from them
+try:
+    importlib.import_module("marcs.TwoPhaseSolver.solver")
+except ImportError:
+    _package("marcs.TwoPhaseSolver")
+    two_phase = types.ModuleType("marcs.TwoPhaseSolver.solver")
+    two_phase.solve = None
+    sys.modules["marcs.TwoPhaseSolver.solver"] = two_phase
+try:
+    importlib.import_module("marcs.RubiksCubeSolver.cube")
+except ImportError:
+    _package("marcs.RubiksCubeSolver")
+    sys.modules["marcs.RubiksCubeSolver.cube"] = types.ModuleType("marcs.RubiksCubeSolver.cube")
@@ -0,0 +1,103 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from marcs.CubeSolver import parallel_solve as ps
+
+R1 = "UUFUUFUUFRRRRRRRRRFFDFFDFFDDDBDDBDDBLLLLLLLLLUBBUBBUBB"
+
+
+def scramble(seed: int, n: int = 25) -> list:
+    rng = random.Random(seed)
+    return [rng.choice(ps.FACES) + rng.choice("123") for _ in range(n)]
+
+
+def rotate_moves(moves: list, rotation: tuple) -> list:
+    return [ps.FACE_OF_NORMAL[ps._matmul(rotation, ps.NORMALS[move[0]])] + move[1] for move in moves]
+
+
+def test_apply_move():
+    assert ps.apply_move(ps.SOLVED, "R1") == R1
+    assert ps.apply_moves(R1, ["R2", "R1"]) == ps.SOLVED
+
+
+def test_rotations():
+    assert len(ps.ROTATIONS) == 24
+    assert all(rotation in ps.ROTATIONS for rotation in ps.DIAGONAL_ROTATIONS)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_variant_solutions_map_back(seed):
+    moves = scramble(seed)
+    cubestr = ps.apply_moves(ps.SOLVED, moves)
+    assert ps.invert(cubestr) == ps.apply_moves(ps.SOLVED, ps.invert_moves(moves))
+    found = ps.variants(cubestr)
+    assert len({state for rotation, inverted, state in found}) == 6
+    for rotation, inverted, state in found:
+        # A solution of the variant is the inverse of the moves leading to it
+        variant_moves = rotate_moves(ps.invert_moves(moves) if inverted else moves, rotation)
+        assert ps.apply_moves(ps.SOLVED, variant_moves) == state
+        solution = ps.invert_moves(variant_moves)
+        if inverted:
+            solution = ps.invert_moves(solution)
+        assert ps.apply_moves(cubestr, ps.unrotate_moves(solution, rotation)) == ps.SOLVED
+
+
+@pytest.mark.parametrize("cubestr", [
+    "",
+    ps.SOLVED[:-1],
+    ps.SOLVED[:-1] + "X",
+    "U" * 54,
+    "R" + ps.SOLVED[1:9] + "U" + ps.SOLVED[10:],  # Two facelets of a corner swapped colors
+    ps.SOLVED[:7] + "R" + ps.SOLVED[8:17] + "U" + ps.SOLVED[18:],  # Edge with the U and R stickers of UR mixed
+])
+def test_invert_rejects_invalid_cube_strings(cubestr):
+    with pytest.raises(ValueError):
+        ps.invert(cubestr)
+
+
+def test_parallel_solve_maps_solutions_back(monkeypatch):
+    moves = scramble(0, 8)
+    cubestr = ps.apply_moves(ps.SOLVED, moves)
+    solutions = {}
+    for rotation, inverted, state in ps.variants(cubestr):
+        variant_moves = rotate_moves(ps.invert_moves(moves) if inverted else moves, rotation)
+        solutions[state] = ps._format(ps.invert_moves(variant_moves))
+    monkeypatch.setattr(ps, "search", lambda state, max_length, timeout: solutions[state])
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        result = ps.parallel_solve(cubestr, deadline=0.5, pool=pool)
+    assert ps.apply_moves(cubestr, ps._parse(result)) == ps.SOLVED
+
+
+def test_parallel_solve_without_solution(monkeypatch):
+    monkeypatch.setattr(ps, "search", lambda state, max_length, timeout: "Error 8: corner twist error")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(ValueError, match="No solution .*Error 8"):
+            ps.parallel_solve(ps.apply_move(ps.SOLVED, "F1"), n_variants=2, pool=pool)
+
+
+def test_parallel_solve_caps_variants(monkeypatch):
+    searched = []
+
+    def record(state, max_length, timeout):
+        searched.append(state)
+        return "Error: no solution"
+
+    monkeypatch.setattr(ps, "search", record)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(ValueError):
+            ps.parallel_solve(ps.apply_move(ps.SOLVED, "F1"), n_variants=12, pool=pool)
+    assert len(searched) == ps.MAX_VARIANTS
+
+
+@pytest.mark.parametrize("n_variants", [0, -1])
+def test_parallel_solve_needs_a_search(n_variants):
+    with pytest.raises(ValueError, match="at least one search"):
+        ps.parallel_solve(ps.SOLVED, n_variants=n_variants)
+
+
+def test_positive_int():
+    assert ps.positive_int("3") == 3
+    with pytest.raises(ps.ArgumentTypeError):
+        ps.positive_int("0")
@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from marcs.CubeSolver import fake_gpio, rigs
+from marcs.CubeSolver.solver import GPIOs, cleanup
+
+PINS = {gpio.name: gpio.value for gpio in GPIOs}
+OTHER_PINS = {color: {x: pin + 100 for x, pin in pins.items()} for color, pins in PINS.items()}
+
+
+@pytest.fixture
+def rig_env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Stepper state files are written to ./states
+    monkeypatch.setattr(rigs, "generate_scramble", lambda: (["U1", "R2"], "scrambled"))
+    monkeypatch.setattr(rigs, "solve", lambda cubestr: "R2 U3 (2f)")
+    fake_gpio.cleanup()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+    fake_gpio.cleanup()
+
+
+def make_rig(pool, name="rig1", pins=PINS, n_solves=2, stop=None):
+    return rigs.Rig(name, pins, pool, n_solves=n_solves, delay_time=0, move_delay_time=0, half_step=True,
+                    stop=stop or threading.Event())
+
+
+def test_rigs_run_concurrently_with_fake_gpio(rig_env):
+    rig_list = [make_rig(rig_env, "rig1", PINS), make_rig(rig_env, "rig2", OTHER_PINS)]
+    writes = fake_gpio.writes
+    for rig in rig_list:
+        rig.start()
+    for rig in rig_list:
+        rig.join()
+        cleanup(rig.cube, release_gpio=False)
+
+    assert fake_gpio.writes > writes
+    for rig in rig_list:
+        assert rig.error is None
+        assert rig.solves == 2
+        assert rig.solves_per_hour > 0
+        for color in ["red", "green", "blue", "yellow", "orange", "white"]:
+            assert Path("states", f"{rig.name}_{color}").read_text() in [str(state) for state in range(9)]
+    assert not Path("states", "red").exists()
+
+
+def test_rig_stops_when_asked(rig_env):
+    stop = threading.Event()
+    stop.set()
+    rig = make_rig(rig_env, stop=stop)
+    rig.start()
+    rig.join()
+    assert rig.solves == 0
+    assert rig.error is None
+
+
+def test_rig_reports_solver_errors(rig_env, monkeypatch):
+    def failing_solve(cubestr):
+        raise RuntimeError("no tables")
+
+    monkeypatch.setattr(rigs, "solve", failing_solve)
+    rig = make_rig(rig_env)
+    rig.start()
+    rig.join()
+    assert rig.solves == 0
+    assert isinstance(rig.error, RuntimeError)
+
+
+def test_solves_per_hour(rig_env):
+    rig = make_rig(rig_env)
+    assert rig.solves_per_hour == 0.
+    rig.solves = 3
+    rig.start_time, rig.end_time = 100., 100. + 1800.
+    assert rig.solves_per_hour == pytest.approx(6.)
+
+
+def test_pin_conflicts_are_rejected():
+    rigs.check_pin_conflicts({"rig1": PINS, "rig2": OTHER_PINS})
+    with pytest.raises(ValueError, match="already used by rig1"):
+        rigs.check_pin_conflicts({"rig1": PINS, "rig2": PINS})
@@ -0,0 +1,40 @@
+import copy
+
+import pytest
+
+from marcs.CubeSolver import solver
+
+FACE_COLORS = ["W", "G", "R", "O", "Y", "B"]
+SOLVED = [[[color] * 3 for _ in range(3)] for color in FACE_COLORS]
+
+
+@pytest.fixture
+def cubelib(monkeypatch):
+    cube = copy.deepcopy(SOLVED)
+    starts = []
+
+    def scramble():
+        starts.append(copy.deepcopy(cube))
+        cube[0][0][0], cube[2][0][0] = cube[2][0][0], cube[0][0][0]  # Face 2 is rotated for the cube string
+
+    monkeypatch.setattr(solver.cubelib, "a", cube, raising=False)
+    monkeypatch.setattr(solver.cubelib, "scramble", scramble, raising=False)
+    monkeypatch.setattr(solver.cubelib, "get_scramble", lambda: "U1 R2", raising=False)
+    monkeypatch.setattr(solver, "_solved_cube", None, raising=False)
+    return starts
+
+
+def test_generate_scramble_starts_from_solved(cubelib):
+    first = solver.generate_scramble()
+    second = solver.generate_scramble()
+    assert first == second
+    assert first[0] == ["U1", "R2"]
+    assert len(first[1]) == 54
+    assert cubelib == [SOLVED, SOLVED]
+
+
+def test_generate_scramble_leaves_cubelib_faces_alone(cubelib):
+    solver.generate_scramble()
+    scrambled = copy.deepcopy(solver.cubelib.a)
+    scrambled[0][0][0], scrambled[2][0][0] = scrambled[2][0][0], scrambled[0][0][0]
+    assert scrambled == SOLVED
@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+from marcs.CubeSolver import tables
+
+
+def test_solver_pool_starts_forked_workers():
+    pool = tables.solver_pool(max_workers=2)
+    try:
+        assert len(pool._processes) == 2
+        assert pool.submit(os.getpid).result() != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_solver_pool_without_fork(monkeypatch):
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    pool = tables.solver_pool(max_workers=1)
+    assert isinstance(pool, ProcessPoolExecutor)
+    pool.shutdown()
+
+
+def _interrupt_self():
+    os.kill(os.getpid(), signal.SIGINT)
+    return os.getpid()
+
+
+def test_solver_pool_workers_ignore_interrupts():
+    pool = tables.solver_pool(max_workers=2)
+    try:
+        pids = {pool.submit(_interrupt_self).result() for _ in range(4)}
+        assert os.getpid() not in pids
+        # The workers survived their interrupts and still take work
+        assert pool.submit(os.getpid).result() in pool._processes
+        assert all(process.is_alive() for process in pool._processes.values())
+    finally:
+        pool.shutdown()